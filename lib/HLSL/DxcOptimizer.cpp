@@ -269,63 +269,63 @@ static ArrayRef<LPCSTR> GetPassArgDescriptions(LPCSTR passName) {
 static bool IsPassOptionName(StringRef S) {
   /* <py::lines('ISPASSOPTIONNAME')>hctdb_instrhelp.get_is_pass_option_name()</py>*/
   // ISPASSOPTIONNAME:BEGIN
-  return S.equals("DL")
-    ||  S.equals("loop-distribute-verify")
-    ||  S.equals("lowerbitsets-avoid-reuse")
-    ||  S.equals("RequiresDomTree")
-    ||  S.equals("loop-distribute-non-if-convertible")
-    ||  S.equals("unroll-dynamic-cost-savings-discount")
-    ||  S.equals("ScalarLoadThreshold")
-    ||  S.equals("bonus-inst-threshold")
-    ||  S.equals("max-reroll-increment")
+  return S.equals("AllowPartial")
+    ||  S.equals("ArrayElementThreshold")
+    ||  S.equals("Count")
+    ||  S.equals("DL")
+    ||  S.equals("FatalErrors")
+    ||  S.equals("Ftor")
+    ||  S.equals("InlineThreshold")
+    ||  S.equals("InsertLifetime")
     ||  S.equals("MaxHeaderSize")
-    ||  S.equals("TIRA")
+    ||  S.equals("NotOptimized")
+    ||  S.equals("Os")
+    ||  S.equals("ReplaceAllVector")
+    ||  S.equals("RequiresDomTree")
     ||  S.equals("Runtime")
-    ||  S.equals("InsertLifetime")
-    ||  S.equals("mergefunc-sanity")
-    ||  S.equals("enable-scoped-noalias")
-    ||  S.equals("sroa-random-shuffle-slices")
+    ||  S.equals("ScalarLoadThreshold")
     ||  S.equals("StructMemberThreshold")
-    ||  S.equals("force-ssa-updater")
-    ||  S.equals("unroll-runtime")
-    ||  S.equals("noloads")
-    ||  S.equals("sroa-strict-inbounds")
-    ||  S.equals("reroll-num-tolerated-failed-matches")
-    ||  S.equals("Count")
-    ||  S.equals("float2int-max-integer-bw")
-    ||  S.equals("ReplaceAllVector")
-    ||  S.equals("likely-branch-weight")
-    ||  S.equals("ArrayElementThreshold")
-    ||  S.equals("no-discriminators")
-    ||  S.equals("sample-profile-file")
-    ||  S.equals("unroll-max-iteration-count-to-analyze")
+    ||  S.equals("TIRA")
     ||  S.equals("TLIImpl")
-    ||  S.equals("rotation-max-header-size")
+    ||  S.equals("Threshold")
+    ||  S.equals("bonus-inst-threshold")
+    ||  S.equals("disable-licm-promotion")
     ||  S.equals("enable-load-pre")
-    ||  S.equals("rewrite-map-file")
+    ||  S.equals("enable-pre")
+    ||  S.equals("enable-scoped-noalias")
+    ||  S.equals("enable-tbaa")
+    ||  S.equals("float2int-max-integer-bw")
+    ||  S.equals("force-ssa-updater")
     ||  S.equals("jump-threading-threshold")
-    ||  S.equals("unroll-count")
+    ||  S.equals("likely-branch-weight")
+    ||  S.equals("loop-distribute-non-if-convertible")
+    ||  S.equals("loop-distribute-verify")
     ||  S.equals("loop-unswitch-threshold")
-    ||  S.equals("Os")
+    ||  S.equals("lowerbitsets-avoid-reuse")
+    ||  S.equals("max-recurse-depth")
+    ||  S.equals("max-reroll-increment")
     ||  S.equals("maxElements")
-    ||  S.equals("InlineThreshold")
-    ||  S.equals("Ftor")
-    ||  S.equals("disable-licm-promotion")
-    ||  S.equals("unroll-percent-dynamic-cost-saved-threshold")
-    ||  S.equals("unroll-threshold")
-    ||  S.equals("vector-library")
-    ||  S.equals("AllowPartial")
+    ||  S.equals("mergefunc-sanity")
+    ||  S.equals("no-discriminators")
+    ||  S.equals("noloads")
     ||  S.equals("pragma-unroll-threshold")
+    ||  S.equals("reroll-num-tolerated-failed-matches")
+    ||  S.equals("rewrite-map-file")
+    ||  S.equals("rotation-max-header-size")
+    ||  S.equals("sample-profile-file")
     ||  S.equals("sample-profile-max-propagate-iterations")
-    ||  S.equals("max-recurse-depth")
-    ||  S.equals("FatalErrors")
-    ||  S.equals("Threshold")
+    ||  S.equals("sroa-random-shuffle-slices")
+    ||  S.equals("sroa-strict-inbounds")
     ||  S.equals("unlikely-branch-weight")
-    ||  S.equals("NotOptimized")
-    ||  S.equals("verify-debug-info")
     ||  S.equals("unroll-allow-partial")
-    ||  S.equals("enable-tbaa")
-    ||  S.equals("enable-pre");
+    ||  S.equals("unroll-count")
+    ||  S.equals("unroll-dynamic-cost-savings-discount")
+    ||  S.equals("unroll-max-iteration-count-to-analyze")
+    ||  S.equals("unroll-percent-dynamic-cost-saved-threshold")
+    ||  S.equals("unroll-runtime")
+    ||  S.equals("unroll-threshold")
+    ||  S.equals("vector-library")
+    ||  S.equals("verify-debug-info");
   // ISPASSOPTIONNAME:END
 }
 
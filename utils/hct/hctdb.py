@@ -986,12 +986,13 @@ class db_dxil(object):
                 assert i.oload_types == "v" or i.oload_types.find("v") < 0, "void overload should be exclusive to other types (%s)" % i.name
             assert type(i.oload_types) is str, "overload for %s should be a string - use empty if n/a" % (i.name)
 
-        # Verify that all operations in each class have the same signature.
+        # Verify that consecutively defined operations of the same class have the same signature.
+        # This is not a per-class guarantee: a class defined in more than one run is only checked
+        # within each run. WavePrefixOp is split this way, and WavePrefixBitCount (defined apart
+        # from the other WavePrefixOp operations) has a different signature.
         import itertools
-        class_sort_func = lambda x, y: x < y
         class_key_func = lambda x : x.dxil_class
-        instr_ordered_by_class = sorted([i for i in self.instr if i.is_dxil_op], class_sort_func)
-        instr_grouped_by_class = itertools.groupby(instr_ordered_by_class, class_key_func)
+        instr_grouped_by_class = itertools.groupby([i for i in self.instr if i.is_dxil_op], class_key_func)
         def calc_oload_sig(inst):
             result = ""
             for o in inst.ops:
@@ -1000,10 +1001,10 @@ class db_dxil(object):
         for k, g in instr_grouped_by_class:
             it = g.__iter__()
             try:
-                first = it.next()
+                first = next(it)
                 first_group = calc_oload_sig(first)
                 while True:
-                    other = it.next()
+                    other = next(it)
                     other_group = calc_oload_sig(other)
                     assert first_group == other_group, "overload signature %s for instruction %s differs from %s in %s" % (first.name, first_group, other.name, other_group)
             except StopIteration:
@@ -1055,7 +1056,7 @@ class db_dxil(object):
         def add_pass(name, type_name, doc, opts):
             apass = db_dxil_pass(name, type_name=type_name, doc=doc)
             for o in opts:
-                assert o.has_key('n'), "option in %s has no 'n' member" % name
+                assert 'n' in o, "option in %s has no 'n' member" % name
                 apass.args.append(db_dxil_pass_arg(o['n'], ident=o.get('i'), type_name=o.get('t'), is_ctor_param=o.get('c'), doc=o.get('d')))
             p.append(apass)
         # Add discriminators is a DWARF 4 thing, useful for the profiler.
@@ -1307,7 +1308,7 @@ class db_dxil(object):
             CSIn,     Invalid, Compute,    None,           Invalid
             Invalid,  Invalid, Invalid,    Invalid,        Invalid
         """
-        table = [map(str.strip, line.split(',')) for line in SigPointCSV.splitlines() if line.strip()]
+        table = [list(map(str.strip, line.split(','))) for line in SigPointCSV.splitlines() if line.strip()]
         for row in table[1:]: assert(len(row) == len(table[0])) # Ensure table is rectangular
         # Make sure labels match enums, otherwise the table isn't aligned or in-sync
         if not ([row[0] for row in table[1:]] == SigPointKind.value_names()):
@@ -1360,7 +1361,7 @@ class db_dxil(object):
             TessFactor,NA,NA,NA,NA,NA,NA,TessFactor,TessFactor,NA,NA,NA,NA,NA,NA,NA,NA
             InsideTessFactor,NA,NA,NA,NA,NA,NA,TessFactor,TessFactor,NA,NA,NA,NA,NA,NA,NA,NA
         """
-        table = [map(str.strip, line.split(',')) for line in SemanticInterpretationCSV.splitlines() if line.strip()]
+        table = [list(map(str.strip, line.split(','))) for line in SemanticInterpretationCSV.splitlines() if line.strip()]
         for row in table[1:]: assert(len(row) == len(table[0])) # Ensure table is rectangular
         # Make sure labels match enums, otherwise the table isn't aligned or in-sync
         assert(table[0][1:] == SigPointKind.value_names()[:-1])                   # exclude Invalid
@@ -1,7 +1,17 @@
 # Copyright (C) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT license. See COPYRIGHT in the project root for full license information.
 import argparse
+import hashlib
+import itertools
+import os
+import sys
+import textwrap
+import CodeTags
 from hctdb import *
+try:
+    import docutils.core
+except ImportError:
+    docutils = None # only needed for -gen docs-spec
 
 # get db singletons
 g_db_dxil = None
@@ -18,55 +28,74 @@ def get_db_hlsl():
         g_db_hlsl = db_hlsl(f)
     return g_db_hlsl
 
+# derived lists are computed once per db and cached on it as tuples, so callers can't modify them
+def category_name_key(v):
+    "Sort key that orders values by category and then by name."
+    return ("" if v.category == None else v.category) + "." + v.name
+
+def get_dxil_ops_by_opid(db):
+    "Returns the DXIL operations sorted by opcode."
+    if not hasattr(db, "dxil_ops_by_opid"):
+        db.dxil_ops_by_opid = tuple(sorted([i for i in db.instr if i.is_dxil_op], key=lambda i : i.dxil_opid))
+    return db.dxil_ops_by_opid
+
+def get_dxil_ops_by_category_name(db):
+    "Returns the DXIL operations sorted by category and name."
+    if not hasattr(db, "dxil_ops_by_category_name"):
+        db.dxil_ops_by_category_name = tuple(sorted([i for i in db.instr if i.is_dxil_op], key=category_name_key))
+    return db.dxil_ops_by_category_name
+
+def get_intrinsics_by_key(db):
+    "Returns the HLSL intrinsics sorted by key."
+    if not hasattr(db, "intrinsics_by_key"):
+        db.intrinsics_by_key = tuple(sorted(db.intrinsics, key=lambda x: x.key))
+    return db.intrinsics_by_key
+
+def get_val_rules_by_category_name(db):
+    "Returns the validation rules sorted by category and name."
+    if not hasattr(db, "val_rules_by_category_name"):
+        db.val_rules_by_category_name = tuple(sorted(db.val_rules, key=category_name_key))
+    return db.val_rules_by_category_name
+
+def get_enum_values_by_name(db, enum_name):
+    "Returns a dict mapping value names to values for the named enum."
+    if not hasattr(db, "enum_values_by_name"):
+        db.enum_values_by_name = {}
+    if enum_name not in db.enum_values_by_name:
+        db.enum_values_by_name[enum_name] = {v.name: v for v in db.enum_idx[enum_name].values}
+    return db.enum_values_by_name[enum_name]
+
+g_comment_wrappers = {}
 def format_comment(prefix, val):
     "Formats a value with a line-comment prefix."
-    result = ""
-    line_width = 80
-    content_width = line_width - len(prefix)
-    l = len(val)
-    while l:
-        if l < content_width:
-            result += prefix + val.strip()
-            result += "\n"
-            l = 0
-        else:
-            split_idx = val.rfind(" ", 0, content_width)
-            result += prefix + val[:split_idx].strip()
-            result += "\n"
-            val = val[split_idx+1:]
-            l = len(val)
-    return result
+    wrapper = g_comment_wrappers.get(prefix)
+    if wrapper is None:
+        line_width = 80
+        # Lines are kept strictly shorter than the line width, prefix included.
+        content_width = line_width - len(prefix) - 1
+        wrapper = textwrap.TextWrapper(width=content_width, break_long_words=False, break_on_hyphens=False)
+        g_comment_wrappers[prefix] = wrapper
+    return "".join([prefix + l + "\n" for l in wrapper.wrap(val)])
+
+def text_of(v):
+    "Returns v as a string, without converting values that already are."
+    return v if type(v) is str else str(v)
 
 def format_rst_table(list_of_tuples):
     "Produces a reStructuredText simple table from the specified list of tuples."
-    # Calculate widths.
-    widths = None
-    for t in list_of_tuples:
-        if widths is None:
-            widths = [0] * len(t)
-        for i, v in enumerate(t):
-            widths[i] = max(widths[i], len(str(v)))
+    # Convert values to text once, then calculate widths.
+    cells = [[text_of(v) for v in t] for t in list_of_tuples]
+    widths = [max([len(c) for c in col]) for col in zip(*cells)]
     # Build banner line.
-    banner = ""
-    for i, w in enumerate(widths):
-        if i > 0:
-            banner += " "
-        banner += "=" * w
-    banner += "\n"
+    banner = " ".join(["=" * w for w in widths]) + "\n"
     # Build the result.
-    result = banner
-    for i, t in enumerate(list_of_tuples):
-        for j, v in enumerate(t):
-            if j > 0:
-                result += " "
-            result += str(v)
-            result += " " * (widths[j] - len(str(v)))
-        result = result.rstrip()
-        result += "\n"
+    result = [banner]
+    for i, row in enumerate(cells):
+        result.append(" ".join([c.ljust(w) for c, w in zip(row, widths)]).rstrip() + "\n")
         if i == 0:
-            result += banner
-    result += banner
-    return result
+            result.append(banner)
+    result.append(banner)
+    return "".join(result)
 
 def build_range_tuples(i):
     "Produces a list of tuples with contiguous ranges in the input list."
@@ -88,88 +117,102 @@ def build_range_tuples(i):
     if not low_bound is None:
         yield (low_bound, high_bound)
 
+g_range_code_cache = {}
 def build_range_code(var, i):
     "Produces a fragment of code that tests whether the variable name matches values in the given range."
-    ranges = build_range_tuples(i)
-    result = ""
-    for r in ranges:
+    cache_key = (var, tuple(sorted(i)))
+    if cache_key not in g_range_code_cache:
+        g_range_code_cache[cache_key] = build_range_code_uncached(var, cache_key[1])
+    return g_range_code_cache[cache_key]
+
+def build_range_code_uncached(var, i):
+    "Produces the range test code for build_range_code without consulting the cache."
+    conds = []
+    for r in build_range_tuples(i):
         if r[0] == r[1]:
-            cond = var + " == " + str(r[0])
-        else:
-            cond = "%d <= %s && %s <= %d" % (r[0], var, var, r[1])
-        if result == "":
-            result = cond
+            conds.append(var + " == " + str(r[0]))
         else:
-            result = result + " || " + cond
-    return result
+            conds.append("%d <= %s && %s <= %d" % (r[0], var, var, r[1]))
+    return " || ".join(conds)
 
 class db_docsref_gen:
     "A generator of reference documentation."
     def __init__(self, db):
         self.db = db
-        instrs = [i for i in self.db.instr if i.is_dxil_op]
-        instrs = sorted(instrs, key=lambda v : ("" if v.category == None else v.category) + "." + v.name)
-        self.instrs = instrs
-        val_rules = sorted(db.val_rules, key=lambda v : ("" if v.category == None else v.category) + "." + v.name)
-        self.val_rules = val_rules
-
-    def print_content(self):
-        self.print_header()
-        self.print_body()
-        self.print_footer()
-
-    def print_header(self):
-        print("<!DOCTYPE html>")
-        print("<html><head><title>DXIL Reference</title>")
-        print("<style>body { font-family: Verdana; font-size: small; }</style>")
-        print("</head><body><h1>DXIL Reference</h1>")
-        self.print_toc("Instructions", "i", self.instrs)
-        self.print_toc("Rules", "r", self.val_rules)
-
-    def print_body(self):
-        self.print_instruction_details()
-        self.print_valrule_details()
-
-    def print_instruction_details(self):
-        print("<h2>Instruction Details</h2>")
+        self.instrs = get_dxil_ops_by_category_name(db)
+        self.val_rules = get_val_rules_by_category_name(db)
+
+    def print_content(self, out):
+        self.print_header(out)
+        self.print_body(out)
+        self.print_footer(out)
+
+    def print_header(self, out):
+        out.write("<!DOCTYPE html>\n")
+        out.write("<html><head><title>DXIL Reference</title>\n")
+        out.write("<style>body { font-family: Verdana; font-size: small; }</style>\n")
+        out.write("</head><body><h1>DXIL Reference</h1>\n")
+        self.print_toc(out, "Instructions", "i", self.instrs)
+        self.print_toc(out, "Rules", "r", self.val_rules)
+
+    def print_body(self, out):
+        self.print_instruction_details(out)
+        self.print_valrule_details(out)
+
+    instr_template = (
+        "<h3><a name='i%(name)s'>%(name)s</a></h3>\n"
+        "<div>Opcode: %(opid)d. This instruction %(doc)s.</div>\n"
+        "%(remarks)s"
+        "<div>Operands:</div>\n"
+        "<ul>\n"
+        "%(operands)s"
+        "</ul>\n"
+        "<div><a href='#Instructions'>(top)</a></div>\n")
+
+    valrule_template = (
+        "<h3><a name='r%(name)s'>%(name)s</a></h3>\n"
+        "<div>%(doc)s</div>\n"
+        "<div><a href='#Rules'>(top)</a></div>\n")
+
+    def operand_html(self, o):
+        if o.pos == 0:
+            return "<li>result: %s - %s</li>\n" % (o.llvm_type, o.doc)
+        enum_desc = "" if o.enum_name == "" else " one of %s: %s" % (o.enum_name, ",".join(self.db.enum_idx[o.enum_name].value_names()))
+        return "<li>%d - %s: %s%s%s</li>\n" % (o.pos - 1, o.name, o.llvm_type, "" if o.doc == "" else " - " + o.doc, enum_desc)
+
+    def print_instruction_details(self, out):
+        result = ["<h2>Instruction Details</h2>\n"]
         for i in self.instrs:
-            print("<h3><a name='i%s'>%s</a></h3>" % (i.name, i.name))
-            print("<div>Opcode: %d. This instruction %s.</div>" % (i.dxil_opid, i.doc))
-            if i.remarks:
+            result.append(self.instr_template % {
+                "name": i.name,
+                "opid": i.dxil_opid,
+                "doc": i.doc,
                 # This is likely a .rst fragment, but this will do for now.
-                print("<div> " + i.remarks + "</div>")
-            print("<div>Operands:</div>")
-            print("<ul>")
-            for o in i.ops:
-                if o.pos == 0:
-                    print("<li>result: %s - %s</li>" % (o.llvm_type, o.doc))
-                else:
-                    enum_desc = "" if o.enum_name == "" else " one of %s: %s" % (o.enum_name, ",".join(db.enum_idx[o.enum_name].value_names()))
-                    print("<li>%d - %s: %s%s%s</li>" % (o.pos - 1, o.name, o.llvm_type, "" if o.doc == "" else " - " + o.doc, enum_desc))
-            print("</ul>")
-            print("<div><a href='#Instructions'>(top)</a></div>")
+                "remarks": "<div> " + i.remarks + "</div>\n" if i.remarks else "",
+                "operands": "".join([self.operand_html(o) for o in i.ops]) })
+        out.write("".join(result))
 
-    def print_valrule_details(self):
-        print("<h2>Rule Details</h2>")
+    def print_valrule_details(self, out):
+        result = ["<h2>Rule Details</h2>\n"]
         for i in self.val_rules:
-            print("<h3><a name='r%s'>%s</a></h3>" % (i.name, i.name))
-            print("<div>" + i.doc + "</div>")
-            print("<div><a href='#Rules'>(top)</a></div>")
+            result.append(self.valrule_template % { "name": i.name, "doc": i.doc })
+        out.write("".join(result))
 
-    def print_toc(self, name, aprefix, values):
-        print("<h2><a name='" + name + "'>" + name + "</a></h2>")
+    def print_toc(self, out, name, aprefix, values):
+        result = ["<h2><a name='" + name + "'>" + name + "</a></h2>\n"]
         last_category = ""
         for i in values:
             if i.category != last_category:
                 if last_category != None:
-                    print("</ul>")
-                print("<div><b>%s</b></div><ul>" % i.category)
+                    result.append("</ul>\n")
+                result.append("<div><b>%s</b></div><ul>\n" % i.category)
                 last_category = i.category
-            print("<li><a href='#" + aprefix + "%s'>%s</a></li>" % (i.name, i.name))
-        print("</ul>")
+            result.append("<li><a href='#%s%s'>%s</a></li>\n" % (aprefix, i.name, i.name))
+        result.append("</ul>\n")
+        out.write("".join(result))
 
-    def print_footer(self):
-        print("</body></html>")
+    def print_footer(self, out):
+        out.write("</body></html>\n")
 
 
 class db_instrhelp_gen:
@@ -183,29 +226,30 @@ class db_instrhelp_gen:
             "i32": "int32_t",
             "u32": "uint32_t"
             }
-
-    def print_content(self):
-        self.print_header()
-        self.print_body()
-        self.print_footer()
-
-    def print_header(self):
-        print("///////////////////////////////////////////////////////////////////////////////")
-        print("//                                                                           //")
-        print("// Copyright (C) Microsoft Corporation. All rights reserved.                 //")
-        print("// DxilInstructions.h                                                        //")
-        print("//                                                                           //")
-        print("// This file provides a library of instruction helper classes.               //")
-        print("//                                                                           //")
-        print("// MUCH WORK YET TO BE DONE - EXPECT THIS WILL CHANGE - GENERATED FILE       //")
-        print("//                                                                           //")
-        print("///////////////////////////////////////////////////////////////////////////////")
-        print("")
-        print("// TODO: add correct include directives")
-        print("// TODO: add accessors with values")
-        print("// TODO: add validation support code, including calling into right fn")
-        print("// TODO: add type hierarchy")
-        print("namespace hlsl {")
+        self.op_const_expr_cache = {}   # generated expressions by (llvm_type, pos)
+
+    def print_content(self, out):
+        self.print_header(out)
+        self.print_body(out)
+        self.print_footer(out)
+
+    def print_header(self, out):
+        out.write("///////////////////////////////////////////////////////////////////////////////\n")
+        out.write("//                                                                           //\n")
+        out.write("// Copyright (C) Microsoft Corporation. All rights reserved.                 //\n")
+        out.write("// DxilInstructions.h                                                        //\n")
+        out.write("//                                                                           //\n")
+        out.write("// This file provides a library of instruction helper classes.               //\n")
+        out.write("//                                                                           //\n")
+        out.write("// MUCH WORK YET TO BE DONE - EXPECT THIS WILL CHANGE - GENERATED FILE       //\n")
+        out.write("//                                                                           //\n")
+        out.write("///////////////////////////////////////////////////////////////////////////////\n")
+        out.write("\n")
+        out.write("// TODO: add correct include directives\n")
+        out.write("// TODO: add accessors with values\n")
+        out.write("// TODO: add validation support code, including calling into right fn\n")
+        out.write("// TODO: add type hierarchy\n")
+        out.write("namespace hlsl {\n")
 
     def bool_lit(self, val):
         return "true" if val else "false";
@@ -216,11 +260,16 @@ class db_instrhelp_gen:
         raise ValueError("Don't know how to describe type %s for operand %s." % (o.llvm_type, o.name))
 
     def op_const_expr(self, o):
+        key = (o.llvm_type, o.pos)
+        if key in self.op_const_expr_cache:
+            return self.op_const_expr_cache[key]
         if o.llvm_type in self.llvm_type_map:
-            return "(%s)(llvm::dyn_cast<llvm::ConstantInt>(Instr->getOperand(%d))->getZExtValue())" % (self.op_type(o), o.pos - 1)
+            result = "(%s)(llvm::dyn_cast<llvm::ConstantInt>(Instr->getOperand(%d))->getZExtValue())" % (self.op_type(o), o.pos - 1)
+            self.op_const_expr_cache[key] = result
+            return result
         raise ValueError("Don't know how to describe type %s for operand %s." % (o.llvm_type, o.name))
 
-    def print_body(self):
+    def print_body(self, out):
         for i in self.db.instr:
             if i.is_reserved: continue
             if i.inst_helper_prefix:
@@ -229,41 +278,39 @@ class db_instrhelp_gen:
                 struct_name = "DxilInst_%s" % i.name
             else:
                 struct_name = "LlvmInst_%s" % i.name
+            lines = []
             if i.doc:
-                print("/// This instruction %s" % i.doc)
-            print("struct %s {" % struct_name)
-            print("  const llvm::Instruction *Instr;")
-            print("  // Construction and identification")
-            print("  %s(llvm::Instruction *pInstr) : Instr(pInstr) {}" % struct_name)
-            print("  operator bool() const {")
+                lines.append("/// This instruction %s" % i.doc)
+            lines.append("struct %s {" % struct_name)
+            lines.append("  const llvm::Instruction *Instr;")
+            lines.append("  // Construction and identification")
+            lines.append("  %s(llvm::Instruction *pInstr) : Instr(pInstr) {}" % struct_name)
+            lines.append("  operator bool() const {")
             if i.is_dxil_op:
-                op_name = i.fully_qualified_name()
-                print("    return hlsl::OP::IsDxilOpFuncCallInst(Instr, %s);" % op_name)
+                lines.append("    return hlsl::OP::IsDxilOpFuncCallInst(Instr, %s);" % i.fully_qualified_name())
             else:
-                print("    return Instr->getOpcode() == llvm::Instruction::%s;" % i.name)
-            print("  }")
-            print("  // Validation support")
-            print("  bool isAllowed() const { return %s; }" % self.bool_lit(i.is_allowed))
+                lines.append("    return Instr->getOpcode() == llvm::Instruction::%s;" % i.name)
+            lines.append("  }")
+            lines.append("  // Validation support")
+            lines.append("  bool isAllowed() const { return %s; }" % self.bool_lit(i.is_allowed))
             if i.is_dxil_op:
-                print("  bool isArgumentListValid() const {")
-                print("    if (%d != llvm::dyn_cast<llvm::CallInst>(Instr)->getNumArgOperands()) return false;" % (len(i.ops) - 1))
-                print("    return true;")
+                lines.append("  bool isArgumentListValid() const {")
+                lines.append("    if (%d != llvm::dyn_cast<llvm::CallInst>(Instr)->getNumArgOperands()) return false;" % (len(i.ops) - 1))
+                lines.append("    return true;")
                 # TODO - check operand types
-                print("  }")
-                AccessorsWritten = False
-                for o in i.ops:
-                    if o.pos > 1: # 0 is return type, 1 is
-                        if not AccessorsWritten:
-                            print("  // Accessors")
-                            AccessorsWritten = True
-                        print("  llvm::Value *get_%s() const { return Instr->getOperand(%d); }" % (o.name, o.pos - 1))
-                        if o.is_const:
-                            print("  %s get_%s_val() const { return %s; }" % (self.op_type(o), o.name, self.op_const_expr(o)))
-            print("};")
-            print("")
-
-    def print_footer(self):
-        print("} // namespace hlsl")
+                lines.append("  }")
+                accessors = [o for o in i.ops if o.pos > 1] # 0 is return type, 1 is opcode
+                if accessors:
+                    lines.append("  // Accessors")
+                for o in accessors:
+                    lines.append("  llvm::Value *get_%s() const { return Instr->getOperand(%d); }" % (o.name, o.pos - 1))
+                    if o.is_const:
+                        lines.append("  %s get_%s_val() const { return %s; }" % (self.op_type(o), o.name, self.op_const_expr(o)))
+            lines.append("};")
+            out.write("\n".join(lines) + "\n\n")
+
+    def print_footer(self, out):
+        out.write("} // namespace hlsl\n")
 
 class db_enumhelp_gen:
     "A generator of enumeration declarations."
@@ -275,52 +322,50 @@ class db_enumhelp_gen:
             "OpCodeClass": "NumOpClasses"
         }
     
-    def print_enum(self, e, **kwargs):
-        print("// %s" % e.doc)
-        print("enum class %s : unsigned {" % e.name)
+    def print_enum(self, out, e, **kwargs):
+        lines = ["// %s" % e.doc, "enum class %s : unsigned {" % e.name]
         hide_val = kwargs.get("hide_val", False)
         sorted_values = e.values
         if kwargs.get("sort_val", True):
-            sorted_values = sorted(e.values, key=lambda v : ("" if v.category == None else v.category) + "." + v.name)
+            sorted_values = sorted(e.values, key=category_name_key)
+        line_format = "  {name}"
+        if not e.is_internal and not hide_val:
+            line_format += " = {value}"
+        line_format += ","
+        doc_line_format = line_format + " // {doc}"
         last_category = None
         for v in sorted_values:
             if v.category != last_category:
                 if last_category != None:
-                    print("")
-                print("  // %s" % v.category)
+                    lines.append("")
+                lines.append("  // %s" % v.category)
                 last_category = v.category
-
-            line_format = "  {name}"
-            if not e.is_internal and not hide_val:
-                line_format += " = {value}"
-            line_format += ","
-            if v.doc:
-                line_format += " // {doc}"
-            print(line_format.format(name=v.name, value=v.value, doc=v.doc))
+            lines.append((doc_line_format if v.doc else line_format).format(name=v.name, value=v.value, doc=v.doc))
         if e.name in self.lastEnumNames:
-            print("")
-            print("  " + self.lastEnumNames[e.name] + " = " + str(len(sorted_values)) + " // exclusive last value of enumeration")
-        print("};")
+            lines.append("")
+            lines.append("  " + self.lastEnumNames[e.name] + " = " + str(len(sorted_values)) + " // exclusive last value of enumeration")
+        lines.append("};")
+        out.write("\n".join(lines) + "\n")
 
-    def print_content(self):
+    def print_content(self, out):
         for e in sorted(self.db.enums, key=lambda e : e.name):
-            self.print_enum(e)
+            self.print_enum(out, e)
 
 class db_oload_gen:
     "A generator of overload tables."
     def __init__(self, db):
         self.db = db
-        instrs = [i for i in self.db.instr if i.is_dxil_op]
-        self.instrs = sorted(instrs, key=lambda i : i.dxil_opid)
+        self.instrs = get_dxil_ops_by_opid(db)
 
-    def print_content(self):
-        self.print_opfunc_props()
-        print("...")
-        self.print_opfunc_table()
+    def print_content(self, out):
+        self.print_opfunc_props(out)
+        out.write("...\n")
+        self.print_opfunc_table(out)
 
-    def print_opfunc_props(self):
-        print("const OP::OpCodeProperty OP::m_OpCodeProps[(unsigned)OP::OpCode::NumOpCodes] = {")
-        print("//   OpCode                       OpCode name,                OpCodeClass                    OpCodeClass name,              void,     h,     f,     d,    i1,    i8,   i16,   i32,   i64  function attribute")
+    def print_opfunc_props(self, out):
+        lines = ["const OP::OpCodeProperty OP::m_OpCodeProps[(unsigned)OP::OpCode::NumOpCodes] = {"]
+        oload_header = "void,     h,     f,     d,    i1,    i8,   i16,   i32,   i64  function attribute"
+        lines.append("//   OpCode                       OpCode name,                OpCodeClass                    OpCodeClass name,              " + oload_header)
         # Example formatted string:
         #   {  OC::TempRegLoad,             "TempRegLoad",              OCC::TempRegLoad,              "tempRegLoad",                false,  true,  true, false,  true, false,  true,  true, false, Attribute::ReadOnly, },
         # 012345678901234567890123456789012345678901234567890123456789012345678901234567890123456789012345678901234567890123456789012345678901234567890123456789012345678901234567890123456789012345678901234567890123456789
@@ -328,23 +373,34 @@ class db_oload_gen:
 
         last_category = None
         # overload types are a string of (v)oid, (h)alf, (f)loat, (d)ouble, (1)-bit, (8)-bit, (w)ord, (i)nt, (l)ong
-        f = lambda i,c : "true," if i.oload_types.find(c) >= 0 else "false,"
+        oload_chars = "vhfd18wil"
+        # indexed by whether the overload is present, pre-padded to the 7-character column width
+        oload_lits = (" false,", "  true,")
         lower_exceptions = { "CBufferLoad" : "cbufferLoad", "CBufferLoadLegacy" : "cbufferLoadLegacy", "GSInstanceID" : "gsInstanceID" }
         lower_fn = lambda t: lower_exceptions[t] if t in lower_exceptions else t[:1].lower() + t[1:]
+        class_texts = {}    # class columns by dxil_class, shared by all instructions in the class
+        oload_texts = {}    # overload columns by oload_types, shared by all instructions with the same overloads
         attr_dict = { "": "None", "ro": "ReadOnly", "rn": "ReadNone" }
-        attr_fn = lambda i : "Attribute::" + attr_dict[i.fn_attr] + ","
+        attr_texts = dict([(k, ("Attribute::" + v + ",").ljust(20)) for k, v in attr_dict.items()])
         for i in self.instrs:
             if last_category != i.category:
                 if last_category != None:
-                    print("")
-                print("  // {category:118} void,     h,     f,     d,    i1,    i8,   i16,   i32,   i64  function attribute".format(category=i.category))
+                    lines.append("")
+                lines.append("  // " + i.category.ljust(118) + " " + oload_header)
                 last_category = i.category
-            print("  {{  OC::{name:24} {quotName:27} OCC::{className:25} {classNameQuot:28} {v:>7}{h:>7}{f:>7}{d:>7}{b:>7}{e:>7}{w:>7}{i:>7}{l:>7} {attr:20} }},".format(
-                name=i.name+",", quotName='"'+i.name+'",', className=i.dxil_class+",", classNameQuot='"'+lower_fn(i.dxil_class)+'",',
-                v=f(i,"v"), h=f(i,"h"), f=f(i,"f"), d=f(i,"d"), b=f(i,"1"), e=f(i,"8"), w=f(i,"w"), i=f(i,"i"), l=f(i,"l"), attr=attr_fn(i)))
-        print("};")
+            if i.dxil_class not in class_texts:
+                class_texts[i.dxil_class] = " OCC::" + (i.dxil_class + ",").ljust(25) + " " + ('"' + lower_fn(i.dxil_class) + '",').ljust(28)
+            if i.oload_types not in oload_texts:
+                oload_texts[i.oload_types] = "".join([oload_lits[c in i.oload_types] for c in oload_chars])
+            lines.append("  {  OC::" + (i.name + ",").ljust(24) +
+                         " " + ('"' + i.name + '",').ljust(27) +
+                         class_texts[i.dxil_class] +
+                         " " + oload_texts[i.oload_types] +
+                         " " + attr_texts[i.fn_attr] + " },")
+        lines.append("};")
+        out.write("\n".join(lines) + "\n")
     
-    def print_opfunc_table(self):
+    def print_opfunc_table(self, out):
         # Print the table for OP::GetOpFunc
         op_type_texts = {
             "$cb": "CBRT(pETy);",
@@ -379,19 +435,19 @@ class db_oload_gen:
         for i in self.instrs:
             if last_category != i.category:
                 if last_category != None:
-                    print("")
-                print("    // %s" % i.category)
+                    out.write("\n")
+                out.write("    // %s\n" % i.category)
                 last_category = i.category
-            line = "  case OpCode::{name:24}".format(name = i.name + ":")
+            line = ["  case OpCode::" + (i.name + ":").ljust(24)]
             for index, o in enumerate(i.ops):
                 assert o.llvm_type in op_type_texts, "llvm type %s in instruction %s is unknown" % (o.llvm_type, i.name)
                 op_type_text = op_type_texts[o.llvm_type]
                 if index == 0:
-                    line = line + "{val:13}".format(val=op_type_text)
+                    line.append(op_type_text.ljust(13))
                 else:
-                    line = line + "{val:9}".format(val=op_type_text)
-            line = line + "break;"
-            print(line)
+                    line.append(op_type_text.ljust(9))
+            line.append("break;")
+            out.write("".join(line) + "\n")
     
 
 class db_valfns_gen:
@@ -399,13 +455,13 @@ class db_valfns_gen:
     def __init__(self, db):
         self.db = db
 
-    def print_content(self):
-        self.print_header()
-        self.print_body()
+    def print_content(self, out):
+        self.print_header(out)
+        self.print_body(out)
 
-    def print_header(self):
-        print("///////////////////////////////////////////////////////////////////////////////")
-        print("// Instruction validation functions.                                         //")
+    def print_header(self, out):
+        out.write("///////////////////////////////////////////////////////////////////////////////\n")
+        out.write("// Instruction validation functions.                                         //\n")
 
     def bool_lit(self, val):
         return "true" if val else "false";
@@ -422,81 +478,92 @@ class db_valfns_gen:
             return "(%s)(llvm::dyn_cast<llvm::ConstantInt>(Instr->getOperand(%d))->getZExtValue())" % (self.op_type(o), o.pos - 1)
         raise ValueError("Don't know how to describe type %s for operand %s." % (o.llvm_type, o.name))
 
-    def print_body(self):
+    def print_body(self, out):
         llvm_instrs = [i for i in self.db.instr if i.is_allowed and not i.is_dxil_op]
-        print("static bool IsLLVMInstructionAllowed(llvm::Instruction &I) {")
-        self.print_comment("  // ", "Allow: %s" % ", ".join([i.name + "=" + str(i.llvm_id) for i in llvm_instrs]))
-        print("  unsigned op = I.getOpcode();")
-        print("  return %s;" % build_range_code("op", [i.llvm_id for i in llvm_instrs]))
-        print("}")
-        print("")
+        out.write("static bool IsLLVMInstructionAllowed(llvm::Instruction &I) {\n")
+        self.print_comment(out, "  // ", "Allow: %s" % ", ".join([i.name + "=" + str(i.llvm_id) for i in llvm_instrs]))
+        out.write("  unsigned op = I.getOpcode();\n")
+        out.write("  return %s;\n" % build_range_code("op", [i.llvm_id for i in llvm_instrs]))
+        out.write("}\n")
+        out.write("\n")
 
-    def print_comment(self, prefix, val):
-        print(format_comment(prefix, val))
+    def print_comment(self, out, prefix, val):
+        out.write(format_comment(prefix, val) + "\n")
 
 class macro_table_gen:
     "A generator for macro tables."
 
     def format_row(self, row, widths, sep=', '):
         frow = [str(item) + sep + (' ' * (width - len(item)))
-                for item, width in zip(row, widths)[:-1]] + [str(row[-1])]
+                for item, width in list(zip(row, widths))[:-1]] + [str(row[-1])]
         return ''.join(frow)
 
     def format_table(self, table, *args, **kwargs):
-        widths = [  reduce(max, [   len(row[i])
-                                    for row in table], 1)
-                    for i in range(len(table[0]))]
-        formatted = []
-        for row in table:
-            formatted.append(self.format_row(row, widths, *args, **kwargs))
-        return formatted
-
-    def print_table(self, table, macro_name):
+        widths = [max(1, max(len(row[i]) for row in table))
+                  for i in range(len(table[0]))]
+        return [self.format_row(row, widths, *args, **kwargs) for row in table]
+
+    def format_macro_table(self, table, macro_name):
         formatted = self.format_table(table)
-        print(  '//   %s\n' % formatted[0] +
+        return ('//   %s\n' % formatted[0] +
                 '#define %s(DO) \\\n' % macro_name +
-                ' \\\n'.join(['  DO(%s)' % frow for frow in formatted[1:]]))
+                ' \\\n'.join(['  DO(%s)' % frow for frow in formatted[1:]]) + '\n')
+
+    def print_table(self, out, table, macro_name):
+        out.write(self.format_macro_table(table, macro_name))
 
 class db_sigpoint_gen(macro_table_gen):
     "A generator for SigPoint tables."
     def __init__(self, db):
         self.db = db
 
-    def print_sigpoint_table(self):
-        self.print_table(self.db.sigpoint_table, 'DO_SIGPOINTS')
+    def format_sigpoint_table(self):
+        return self.format_macro_table(self.db.sigpoint_table, 'DO_SIGPOINTS')
+
+    def format_interpretation_table(self):
+        return self.format_macro_table(self.db.interpretation_table, 'DO_INTERPRETATION_TABLE')
 
-    def print_interpretation_table(self):
-        self.print_table(self.db.interpretation_table, 'DO_INTERPRETATION_TABLE')
+    def print_sigpoint_table(self, out):
+        out.write(self.format_sigpoint_table())
 
-    def print_content(self):
-        self.print_sigpoint_table()
-        self.print_interpretation_table()
+    def print_interpretation_table(self, out):
+        out.write(self.format_interpretation_table())
+
+    def print_content(self, out):
+        self.print_sigpoint_table(out)
+        self.print_interpretation_table(out)
 
 class string_output:
     def __init__(self):
-        self.val = ""
+        self.val = []
     def write(self, text):
-        self.val = self.val + str(text)
+        self.val.append(str(text))
     def __str__(self):
-        return self.val
+        return "".join(self.val)
 
-def run_with_stdout(fn):
-    import sys
-    _stdout_saved = sys.stdout
+def run_with_output(fn):
+    "Runs fn with a string buffer as its output stream and returns the text written."
     so = string_output()
-    try:
-        sys.stdout = so
-        fn()
-    finally:
-        sys.stdout = _stdout_saved
+    fn(so)
     return str(so)
 
+g_text_cache = {}
+def cached_text(fn):
+    "Decorates a no-argument text generator so the DB is only rendered once."
+    def cached_fn():
+        if fn not in g_text_cache:
+            g_text_cache[fn] = fn()
+        return g_text_cache[fn]
+    cached_fn.__name__ = fn.__name__
+    cached_fn.__doc__ = fn.__doc__
+    return cached_fn
+
 def get_hlsl_intrinsic_stats():
     db = get_db_hlsl()
     longest_fn = db.intrinsics[0]
     longest_param = None
     longest_arglist_fn = db.intrinsics[0]
-    for i in sorted(db.intrinsics, key=lambda x: x.key):
+    for i in get_intrinsics_by_key(db):
         # Get some values for maximum lengths.
         if len(i.name) > len(longest_fn.name):
             longest_fn = i
@@ -505,120 +572,110 @@ def get_hlsl_intrinsic_stats():
                 longest_param = p
         if len(i.params) > len(longest_arglist_fn.params):
             longest_arglist_fn = i
-    result = ""
+    result = []
     for k in sorted(db.namespaces.keys()):
         v = db.namespaces[k]
-        result += "static const UINT g_u%sCount = %d;\n" % (k, len(v.intrinsics))
-    result += "\n"
-    result += "static const int g_MaxIntrinsicName = %d; // Count of characters for longest intrinsic name - '%s'\n" % (len(longest_fn.name), longest_fn.name)
-    result += "static const int g_MaxIntrinsicParamName = %d; // Count of characters for longest intrinsic parameter name - '%s'\n" % (len(longest_param.name), longest_param.name)
-    result += "static const int g_MaxIntrinsicParamCount = %d; // Count of parameters (without return) for longest intrinsic argument list - '%s'\n" % (len(longest_arglist_fn.params) - 1, longest_arglist_fn.name)
-    return result
+        result.append("static const UINT g_u%sCount = %d;\n" % (k, len(v.intrinsics)))
+    result.append("\n")
+    result.append("static const int g_MaxIntrinsicName = %d; // Count of characters for longest intrinsic name - '%s'\n" % (len(longest_fn.name), longest_fn.name))
+    result.append("static const int g_MaxIntrinsicParamName = %d; // Count of characters for longest intrinsic parameter name - '%s'\n" % (len(longest_param.name), longest_param.name))
+    result.append("static const int g_MaxIntrinsicParamCount = %d; // Count of parameters (without return) for longest intrinsic argument list - '%s'\n" % (len(longest_arglist_fn.params) - 1, longest_arglist_fn.name))
+    return "".join(result)
 
 def get_hlsl_intrinsics():
     db = get_db_hlsl()
-    result = ""
-    last_ns = ""
-    ns_table = ""
-    id_prefix = ""
-    arg_idx = 0
+    result = []
     opcode_namespace = db.opcode_namespace
-    for i in sorted(db.intrinsics, key=lambda x: x.key):
-        if last_ns != i.ns:
-            last_ns = i.ns
-            id_prefix = "IOP" if last_ns == "Intrinsics" else "MOP"
-            if (len(ns_table)):
-                result += ns_table + "};\n"
-            result += "\n//\n// Start of %s\n//\n\n" % (last_ns)
-            # This used to be qualified as __declspec(selectany), but that's no longer necessary.
-            ns_table = "static const HLSL_INTRINSIC g_%s[] =\n{\n" % (last_ns)
-            arg_idx = 0
-        ns_table += "    (UINT)%s::%s_%s, %s, %s, %d, %d, g_%s_Args%s,\n" % (opcode_namespace, id_prefix, i.name, str(i.readonly).lower(), str(i.readnone).lower(), i.overload_param_index,len(i.params), last_ns, arg_idx)
-        result += "static const HLSL_INTRINSIC_ARGUMENT g_%s_Args%s[] =\n{\n" % (last_ns, arg_idx)
-        for p in i.params:
-            result += "    \"%s\", %s, %s, %s, %s, %s, %s, %s,\n" % (
-                p.name, p.param_qual, p.template_id, p.template_list,
-                p.component_id, p.component_list, p.rows, p.cols)
-        result += "};\n\n"
-        arg_idx += 1
-    result += ns_table + "};\n"
-    return result
+    for ns, ns_intrinsics in itertools.groupby(get_intrinsics_by_key(db), lambda x: x.ns):
+        id_prefix = "IOP" if ns == "Intrinsics" else "MOP"
+        result.append("\n//\n// Start of %s\n//\n\n" % (ns))
+        # This used to be qualified as __declspec(selectany), but that's no longer necessary.
+        ns_table = ["static const HLSL_INTRINSIC g_%s[] =\n{\n" % (ns)]
+        for arg_idx, i in enumerate(ns_intrinsics):
+            ns_table.append("    (UINT)%s::%s_%s, %s, %s, %d, %d, g_%s_Args%s,\n" % (opcode_namespace, id_prefix, i.name, str(i.readonly).lower(), str(i.readnone).lower(), i.overload_param_index,len(i.params), ns, arg_idx))
+            result.append("static const HLSL_INTRINSIC_ARGUMENT g_%s_Args%s[] =\n{\n" % (ns, arg_idx))
+            for p in i.params:
+                result.append("    \"%s\", %s, %s, %s, %s, %s, %s, %s,\n" % (
+                    p.name, p.param_qual, p.template_id, p.template_list,
+                    p.component_id, p.component_list, p.rows, p.cols))
+            result.append("};\n\n")
+        result.extend(ns_table)
+        result.append("};\n")
+    return "".join(result)
+
+def get_intrinsic_enum_sections(db):
+    "Returns the unique intrinsic enum names, unsigned op names and (enum name, unsigned op) pairs in key order."
+    if not hasattr(db, "intrinsic_enum_sections"):
+        enum_names = []
+        unsigned_pairs = []
+        enumed = set()
+        unsigned_enumed = set()
+        for i in get_intrinsics_by_key(db):
+            if i.enum_name not in enumed:
+                enum_names.append(i.enum_name)
+                enumed.add(i.enum_name)
+            if i.unsigned_op != "" and i.enum_name not in unsigned_enumed:
+                unsigned_pairs.append((i.enum_name, i.unsigned_op))
+                unsigned_enumed.add(i.enum_name)
+        # unsigned ops get their own enum values unless the name is already taken
+        unsigned_ops = []
+        for i in get_intrinsics_by_key(db):
+            if i.unsigned_op != "" and i.unsigned_op not in enumed:
+                unsigned_ops.append(i.unsigned_op)
+                enumed.add(i.unsigned_op)
+        db.intrinsic_enum_sections = (tuple(enum_names), tuple(unsigned_ops), tuple(unsigned_pairs))
+    return db.intrinsic_enum_sections
 
 def enum_hlsl_intrinsics():
     db = get_db_hlsl()
-    result = ""
-    enumed = []
-    for i in sorted(db.intrinsics, key=lambda x: x.key):
-        if (i.enum_name not in enumed):
-            result += "  %s,\n" % (i.enum_name)
-            enumed.append(i.enum_name)
+    enum_names, unsigned_ops = get_intrinsic_enum_sections(db)[:2]
+    result = ["  %s,\n" % (n) for n in enum_names]
     # unsigned
-    result += "  // unsigned\n"
-
-    for i in sorted(db.intrinsics, key=lambda x: x.key):
-        if (i.unsigned_op != ""):
-          if (i.unsigned_op not in enumed):
-            result += "  %s,\n" % (i.unsigned_op)
-            enumed.append(i.unsigned_op)
-
-    result += "  Num_Intrinsics,\n"
-    return result
+    result.append("  // unsigned\n")
+    result.extend(["  %s,\n" % (n) for n in unsigned_ops])
+    result.append("  Num_Intrinsics,\n")
+    return "".join(result)
 
 def has_unsigned_hlsl_intrinsics():
     db = get_db_hlsl()
-    result = ""
-    enumed = []
-    # unsigned
-    for i in sorted(db.intrinsics, key=lambda x: x.key):
-        if (i.unsigned_op != ""):
-          if (i.enum_name not in enumed):
-            result += "  case IntrinsicOp::%s:\n" % (i.enum_name)
-            enumed.append(i.enum_name)
-    return result
+    unsigned_pairs = get_intrinsic_enum_sections(db)[2]
+    return "".join(["  case IntrinsicOp::%s:\n" % (p[0]) for p in unsigned_pairs])
 
 def get_unsigned_hlsl_intrinsics():
     db = get_db_hlsl()
-    result = ""
-    enumed = []
-    # unsigned
-    for i in sorted(db.intrinsics, key=lambda x: x.key):
-        if (i.unsigned_op != ""):
-          if (i.enum_name not in enumed):
-            enumed.append(i.enum_name)
-            result += "  case IntrinsicOp::%s:\n" % (i.enum_name)
-            result += "    return static_cast<unsigned>(IntrinsicOp::%s);\n" % (i.unsigned_op)
-    return result
+    unsigned_pairs = get_intrinsic_enum_sections(db)[2]
+    return "".join(["  case IntrinsicOp::%s:\n    return static_cast<unsigned>(IntrinsicOp::%s);\n" % (n, u) for n, u in unsigned_pairs])
 
 def get_oloads_props():
     db = get_db_dxil()
     gen = db_oload_gen(db)
-    return run_with_stdout(lambda: gen.print_opfunc_props())
+    return run_with_output(gen.print_opfunc_props)
         
 def get_oloads_funcs():
     db = get_db_dxil()
     gen = db_oload_gen(db)
-    return run_with_stdout(lambda: gen.print_opfunc_table())
+    return run_with_output(gen.print_opfunc_table)
 
 def get_enum_decl(name, **kwargs):
     db = get_db_dxil()
     gen = db_enumhelp_gen(db)
-    return run_with_stdout(lambda: gen.print_enum(db.enum_idx[name], **kwargs))
+    return run_with_output(lambda out: gen.print_enum(out, db.enum_idx[name], **kwargs))
 
 def get_valrule_enum():
     return get_enum_decl("ValidationRule", hide_val=True)
 
 def get_valrule_text():
     db = get_db_dxil()
-    result = "switch(value) {\n"
+    result = ["switch(value) {\n"]
     for v in db.enum_idx["ValidationRule"].values:
-        result += "  case hlsl::ValidationRule::" + v.name + ": return \"" + v.err_msg + "\";\n"
-    result += "}\n"
-    return result
+        result.append("  case hlsl::ValidationRule::" + v.name + ": return \"" + v.err_msg + "\";\n")
+    result.append("}\n")
+    return "".join(result)
 
 def get_instrhelper():
     db = get_db_dxil()
     gen = db_instrhelp_gen(db)
-    return run_with_stdout(lambda: gen.print_body())
+    return run_with_output(gen.print_body)
 
 def get_instrs_pred(varname, pred, attr_name="dxil_opid"):
     db = get_db_dxil()
@@ -650,7 +707,7 @@ def get_instrs_rst():
 
 def get_init_passes():
     "Create a series of statements to initialize passes in a registry."
-    db = db_dxil()
+    db = get_db_dxil()
     result = ""
     for p in sorted(db.passes, key=lambda p : p.type_name):
         result += "initialize%sPass(Registry);\n" % p.type_name
@@ -658,7 +715,7 @@ def get_init_passes():
 
 def get_pass_arg_names():
     "Return an ArrayRef of argument names based on passName"
-    db = db_dxil()
+    db = get_db_dxil()
     decl_result = ""
     check_result = ""
     for p in sorted(db.passes, key=lambda p : p.type_name):
@@ -674,7 +731,7 @@ def get_pass_arg_names():
 
 def get_pass_arg_descs():
     "Return an ArrayRef of argument descriptions based on passName"
-    db = db_dxil()
+    db = get_db_dxil()
     decl_result = ""
     check_result = ""
     for p in sorted(db.passes, key=lambda p : p.type_name):
@@ -690,23 +747,22 @@ def get_pass_arg_descs():
 
 def get_is_pass_option_name():
     "Create a return expression to check whether a value 'S' is a pass option name."
-    db = db_dxil()
+    db = get_db_dxil()
     prefix = ""
     result = "return "
-    for k in db.pass_idx_args:
+    for k in sorted(db.pass_idx_args):
         result += prefix + "S.equals(\"%s\")" % k
         prefix = "\n  ||  "
     return result + ";"
 
 def get_opcodes_rst():
     "Create an rst table of opcodes"
-    db = db_dxil()
-    instrs = [i for i in db.instr if i.is_allowed and i.is_dxil_op]
-    instrs = sorted(instrs, key=lambda v : v.dxil_opid)
+    db = get_db_dxil()
+    instrs = [i for i in get_dxil_ops_by_opid(db) if i.is_allowed]
     rows = []
     rows.append(["ID", "Name", "Description"])
     for i in instrs:
-        rows.append([i.dxil_opid, i.dxil_op, i.doc])
+        rows.append([str(i.dxil_opid), i.dxil_op, i.doc])
     result = "\n\n" + format_rst_table(rows) + "\n\n"
     # Add detailed instruction information where available.
     instrs = sorted(instrs, key=lambda v : v.name)
@@ -717,7 +773,7 @@ def get_opcodes_rst():
 
 def get_valrules_rst():
     "Create an rst table of validation rules instructions."
-    db = db_dxil()
+    db = get_db_dxil()
     rules = [i for i in db.val_rules if not i.is_disabled]
     rules = sorted(rules, key=lambda v : v.name)
     rows = []
@@ -729,78 +785,62 @@ def get_valrules_rst():
 def get_opsigs():
     # Create a list of DXIL operation signatures, sorted by ID.
     db = get_db_dxil()
-    instrs = [i for i in db.instr if i.is_dxil_op]
-    instrs = sorted(instrs, key=lambda v : v.dxil_opid)
+    instrs = get_dxil_ops_by_opid(db)
     # db_dxil already asserts that the numbering is dense.
     # Create the code to write out.
-    code = "static const char *OpCodeSignatures[] = {\n"
+    code = ["static const char *OpCodeSignatures[] = {\n"]
+    last_idx = len(instrs) - 1
     for inst_idx,i in enumerate(instrs):
-        code += "  \"("
-        for operand in i.ops:
-            if operand.pos > 1: # skip 0 (the return value) and 1 (the opcode itself)
-                code += operand.name
-                if operand.pos < len(i.ops) - 1:
-                    code += ","
-        code += ")\""
-        if inst_idx < len(instrs) - 1:
-            code += ","
-        code += "  // " + i.name
-        code += "\n"
-    code += "};\n"
-    return code
+        # skip 0 (the return value) and 1 (the opcode itself)
+        names = [o.name for o in i.ops if o.pos > 1]
+        code.append("  \"(" + ",".join(names) + ")\"" + ("," if inst_idx < last_idx else "") + "  // " + i.name + "\n")
+    code.append("};\n")
+    return "".join(code)
 
+@cached_text
 def get_valopcode_sm_text():
     db = get_db_dxil()
-    instrs = [i for i in db.instr if i.is_dxil_op]
-    instrs = sorted(instrs, key=lambda v : v.shader_models + "." + ("%4d" % v.dxil_opid))
+    instrs = sorted(get_dxil_ops_by_opid(db), key=lambda v : (v.shader_models, v.dxil_opid))
     last_model = None
     model_instrs = []
-    code = ""
+    parts = []
     def flush_instrs(model_instrs, model_name):
         if len(model_instrs) == 0:
             return ""
         if model_name == "*": # don't write these out, instead fall through
             return ""
-        result = format_comment("// ", "Instructions: %s" % ", ".join([i.name + "=" + str(i.dxil_opid) for i in model_instrs]))
-        result += "if (" + build_range_code("op", [i.dxil_opid for i in model_instrs]) + ")\n"
-        result += "  return "
-        if last_model == "*":
-            result += "true"
-        else:
-            for code_idx,code in enumerate(last_model):
-                if code_idx > 0:
-                    result += " || "
-                result += "pSM->Is" + code.upper() + "S()"
-        result += ";\n"
+        result = format_comment("// ", "Instructions: %s" % ", ".join(["%s=%d" % (name, opid) for name, opid in model_instrs]))
+        result += "if (" + build_range_code("op", [opid for _, opid in model_instrs]) + ")\n"
+        result += "  return " + " || ".join(["pSM->Is%sS()" % m.upper() for m in model_name]) + ";\n"
         return result
 
     for i in instrs:
         if i.shader_models != last_model:
-            code += flush_instrs(model_instrs, last_model)
+            parts.append(flush_instrs(model_instrs, last_model))
             model_instrs = []
             last_model = i.shader_models
-        model_instrs.append(i)
-    code += flush_instrs(model_instrs, last_model)
-    code += "return true;\n"
-    return code
+        model_instrs.append((i.name, i.dxil_opid))
+    parts.append(flush_instrs(model_instrs, last_model))
+    parts.append("return true;\n")
+    return "".join(parts)
 
+@cached_text
 def get_sigpoint_table():
     db = get_db_dxil()
     gen = db_sigpoint_gen(db)
-    return run_with_stdout(lambda: gen.print_sigpoint_table())
+    return gen.format_sigpoint_table()
 
+@cached_text
 def get_sigpoint_rst():
     "Create an rst table for SigPointKind."
     db = get_db_dxil()
-    rows = [row[:] for row in db.sigpoint_table[:-1]]   # Copy table
-    e = dict([(v.name, v) for v in db.enum_idx['SigPointKind'].values])
-    rows[0] = ['ID'] + rows[0] + ['Description']
-    for i in range(1, len(rows)):
-        row = rows[i]
-        v = e[row[0]]
-        rows[i] = [v.value] + row + [v.doc]
+    src = db.sigpoint_table
+    e = get_enum_values_by_name(db, 'SigPointKind')
+    rows = [['ID'] + src[0] + ['Description']]
+    rows += [[e[row[0]].value] + row + [e[row[0]].doc] for row in src[1:-1]]
     return "\n\n" + format_rst_table(rows) + "\n\n"
 
+@cached_text
 def get_sem_interpretation_enum_rst():
     db = get_db_dxil()
     rows = ([['ID', 'Name', 'Description']] +
@@ -808,51 +848,67 @@ def get_sem_interpretation_enum_rst():
              for v in db.enum_idx['SemanticInterpretationKind'].values[:-1]])
     return "\n\n" + format_rst_table(rows) + "\n\n"
 
+@cached_text
 def get_sem_interpretation_table_rst():
     db = get_db_dxil()
     return "\n\n" + format_rst_table(db.interpretation_table) + "\n\n"
 
+@cached_text
 def get_interpretation_table():
     db = get_db_dxil()
     gen = db_sigpoint_gen(db)
-    return run_with_stdout(lambda: gen.print_interpretation_table())
-
+    return gen.format_interpretation_table()
+
+
+def _file_digest(file_path):
+    "Hash a file's text in chunks, so it never has to be held in memory whole."
+    h = hashlib.sha256()
+    with open(file_path, 'rt') as f:
+        while True:
+            chunk = f.read(65536)
+            if not chunk:
+                break
+            if not isinstance(chunk, bytes):
+                chunk = chunk.encode("utf-8")
+            h.update(chunk)
+    return h.digest()
 
 def RunCodeTagUpdate(file_path):
-    import os
-    import CodeTags
     print(" ... updating " + file_path)
     args = [file_path, file_path + ".tmp"]
     result = CodeTags.main(args)
     if result != 0:
         print(" ... error: %d" % result)
     else:
-        with open(file_path, 'rt') as f:
-            before = f.read()
-        with open(file_path + ".tmp", 'rt') as f:
-            after = f.read()
-        if before == after:
+        if _file_digest(file_path) == _file_digest(file_path + ".tmp"):
             print("  --- no changes found")
+            os.remove(file_path + ".tmp")
         else:
             print("  +++ changes found, updating file")
-            with open(file_path, 'wt') as f:
-                f.write(after)
-        os.remove(file_path + ".tmp")
+            if hasattr(os, "replace"):
+                os.replace(file_path + ".tmp", file_path)
+            else:
+                # Python 2 has no os.replace, and os.rename only overwrites outside Windows.
+                if os.name == "nt":
+                    os.remove(file_path)
+                os.rename(file_path + ".tmp", file_path)
 
 if __name__ == "__main__":
+    # Let the <py> tags' "import hctdb_instrhelp" reuse this module and its DB singletons.
+    sys.modules.setdefault("hctdb_instrhelp", sys.modules[__name__])
     parser = argparse.ArgumentParser(description="Generate code to handle instructions.")
     parser.add_argument("-gen", choices=["docs-ref", "docs-spec", "inst-header", "enums", "oloads", "valfns"], help="Output type to generate.")
     parser.add_argument("-update-files", action="store_const", const=True)
     args = parser.parse_args()
     
     db = get_db_dxil() # used by all generators, also handy to have it run validation
+    gen = None
 
     if args.gen == "docs-ref":
         gen = db_docsref_gen(db)
-        gen.print_content()
 
     if args.gen == "docs-spec":
-        import os, docutils.core
+        assert docutils is not None, "docutils is required for -gen docs-spec"
         assert "HLSL_SRC_DIR" in os.environ, "Environment variable HLSL_SRC_DIR is not defined"
         hlsl_src_dir = os.environ["HLSL_SRC_DIR"]
         spec_file = os.path.abspath(os.path.join(hlsl_src_dir, "docs/DXIL.rst"))
@@ -861,25 +917,23 @@ if __name__ == "__main__":
 
     if args.gen == "inst-header":
         gen = db_instrhelp_gen(db)
-        gen.print_content()
 
     if args.gen == "enums":
         gen = db_enumhelp_gen(db)
-        gen.print_content()
 
     if args.gen == "oloads":
         gen = db_oload_gen(db)
-        gen.print_content()
 
     if args.gen == "valfns":
         gen = db_valfns_gen(db)
-        gen.print_content()
+
+    if gen is not None:
+        # Render into a buffer and emit it with a single write.
+        sys.stdout.write(run_with_output(gen.print_content))
+        sys.stdout.flush()
 
     if args.update_files:
         print("Updating files ...")
-        import CodeTags
-        import os
-        
         assert "HLSL_SRC_DIR" in os.environ, "Environment variable HLSL_SRC_DIR is not defined"
         hlsl_src_dir = os.environ["HLSL_SRC_DIR"]
         pj = lambda *parts: os.path.abspath(os.path.join(*parts))
@@ -896,5 +950,6 @@ if __name__ == "__main__":
             'tools/clang/tools/dxcompiler/dxcompilerobj.cpp',
             'lib/HLSL/DxilSigPoint.cpp',
             ]
-        for relative_file_path in files:
-            RunCodeTagUpdate(pj(hlsl_src_dir, relative_file_path))
+        abs_files = [pj(hlsl_src_dir, p) for p in files]
+        for path in abs_files:
+            RunCodeTagUpdate(path)